@@ -1,15 +1,22 @@
 import { NextResponse } from 'next/server';
 
+// Serve probes from the cached response, regenerated at most every 5 seconds
+export const revalidate = 5;
+
+// Read the environment once per server instance rather than on every probe
+const ENVIRONMENT = process.env.NODE_ENV;
+const FEATURES = {
+    nvidia_nim: !!process.env.NVIDIA_API_KEY,
+    model: process.env.NVIDIA_MODEL || 'deepseek-ai/deepseek-r1',
+};
+
 export async function GET() {
     return NextResponse.json({
         status: 'healthy',
         service: 'NVIDIA Doc Navigator',
         version: '2.0.0',
         timestamp: new Date().toISOString(),
-        environment: process.env.NODE_ENV,
-        features: {
-            nvidia_nim: !!process.env.NVIDIA_API_KEY,
-            model: process.env.NVIDIA_MODEL || 'deepseek-ai/deepseek-r1',
-        }
+        environment: ENVIRONMENT,
+        features: FEATURES,
     });
 }
@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server';
-import OpenAI from 'openai';
+import type OpenAI from 'openai';
+import { TTLCache, normalizeQuery } from '@/lib/queryCache';
 
 // NVIDIA NIM Configuration - Use secure environment variable access
 const NVIDIA_API_KEY = process.env.NVIDIA_API_KEY;
@@ -8,34 +9,92 @@ const NVIDIA_MODEL = process.env.NVIDIA_MODEL || 'deepseek-ai/deepseek-r1';
 
 // API Configuration Constants - Best practices for NVIDIA NIM
 const API_TIMEOUT_MS = 30000; // 30 second timeout for LLM responses
+const STREAM_IDLE_TIMEOUT_MS = 30000; // Abort a stream that goes this long without a chunk
+const STREAM_MAX_DURATION_MS = 300000; // Overall cap on one streamed answer (long R1 reasoning)
 const MAX_RETRIES = 3;
 const RETRY_DELAY_MS = 1000; // Base delay for exponential backoff
+const MAX_RETRY_AFTER_MS = 10000; // Give up instead of waiting longer than this on Retry-After
 const MAX_QUERY_LENGTH = 4000; // Prevent token overflow
+const MAX_BODY_BYTES = 32 * 1024; // A max-length query, JSON-escaped, fits well within this
 const RATE_LIMIT_WINDOW_MS = 60000; // 1 minute window
 const MAX_REQUESTS_PER_WINDOW = 30;
+const ANSWER_CACHE_TTL_MS = 600000; // Reuse LLM answers for 10 minutes
+const ANSWER_CACHE_MAX_ENTRIES = 500; // Bound memory per server instance
 
 // Simple in-memory rate limiting (for production, use Redis)
 const rateLimitMap = new Map<string, { count: number; resetTime: number }>();
 
+// Rejection served to throttled clients, serialized once
+const RATE_LIMITED_BODY = JSON.stringify({ error: 'Rate limit exceeded. Please try again later.' });
+const RATE_LIMITED_HEADERS = {
+    'Content-Type': 'application/json',
+    'Retry-After': String(RATE_LIMIT_WINDOW_MS / 1000),
+};
+
+// LLM answers keyed on query type plus normalized query, so repeat questions skip the
+// NIM round-trip. The type is part of the key because it selects the docs section NIM sees.
+const answerCache = new TTLCache<string>(ANSWER_CACHE_TTL_MS, ANSWER_CACHE_MAX_ENTRIES);
+// Pending non-streaming NIM calls under the same key. Streamed answers are not
+// coalesced: each stream renders its own tokens as they arrive, and only joins
+// the cache once it completes.
+const inFlightAnswers = new Map<string, Promise<string | null>>();
+
 // Utility: Sleep for retry backoff
 const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
 
+// Sanitization patterns, compiled once at module load
+const HTML_TAG_PATTERN = /<[^>]*>/g;
+const CONTROL_CHAR_PATTERN = /[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]/g;
+
 // Utility: Sanitize user input
 function sanitizeInput(input: string): string {
     return input
         .trim()
-        .replace(/<[^>]*>/g, '') // Remove HTML tags
-        .replace(/[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]/g, '') // Remove control characters
+        .replace(HTML_TAG_PATTERN, '') // Remove HTML tags
+        .replace(CONTROL_CHAR_PATTERN, '') // Remove control characters
         .slice(0, MAX_QUERY_LENGTH);
 }
 
+// Utility: Read the request body as text, or null once it grows past maxBytes.
+// Counts bytes as they arrive, so chunked uploads without Content-Length are capped too.
+async function readBodyText(request: NextRequest, maxBytes: number): Promise<string | null> {
+    if (!request.body) {
+        return '';
+    }
+
+    const reader = request.body.getReader();
+    const decoder = new TextDecoder();
+    let received = 0;
+    let text = '';
+
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) {
+            return text + decoder.decode();
+        }
+
+        received += value.byteLength;
+        if (received > maxBytes) {
+            await reader.cancel();
+            return null;
+        }
+        text += decoder.decode(value, { stream: true });
+    }
+}
+
 // Utility: Check rate limit
 function checkRateLimit(clientId: string): { allowed: boolean; remaining: number } {
     const now = Date.now();
     const record = rateLimitMap.get(clientId);
 
     if (!record || now > record.resetTime) {
+        // Re-insert so the map stays ordered by resetTime, then drop stale windows from the head
+        rateLimitMap.delete(clientId);
         rateLimitMap.set(clientId, { count: 1, resetTime: now + RATE_LIMIT_WINDOW_MS });
+        for (const [id, entry] of rateLimitMap) {
+            if (entry.resetTime >= now) break;
+            rateLimitMap.delete(id);
+        }
         return { allowed: true, remaining: MAX_REQUESTS_PER_WINDOW - 1 };
     }
 
@@ -68,38 +127,47 @@ When answering:
 
 Never hallucinate unreleased hardware, internal systems, or private APIs.`;
 
-// Sample NVIDIA documentation data for RAG context
-const NVIDIA_DOCS_CONTEXT = `
-## MIG (Multi-Instance GPU) Configuration
+// Sample NVIDIA documentation data for RAG context, one section per topic
+const NVIDIA_DOCS_SECTIONS = {
+    mig: `## MIG (Multi-Instance GPU) Configuration
 MIG is available on NVIDIA A100, A30, and H100 GPUs. To enable MIG:
 1. Enable MIG mode: sudo nvidia-smi -i <GPU_ID> -mig 1
 2. Create GPU instances: sudo nvidia-smi mig -cgi <profile>
 3. Create compute instances: sudo nvidia-smi mig -cci
-Profiles: 1g.5gb, 2g.10gb, 3g.20gb, 4g.20gb, 7g.40gb (A100-40GB)
-
-## CUDA Optimization Best Practices
+Profiles: 1g.5gb, 2g.10gb, 3g.20gb, 4g.20gb, 7g.40gb (A100-40GB)`,
+    cuda: `## CUDA Optimization Best Practices
 - Use shared memory for frequently accessed data
 - Coalesce memory accesses for global memory
 - Use streams for concurrent kernel execution
 - Profile with NVIDIA Nsight Systems and Nsight Compute
-- Consider occupancy when choosing block sizes
-
-## TensorRT Optimization
+- Consider occupancy when choosing block sizes`,
+    tensorrt: `## TensorRT Optimization
 - Use FP16/INT8 precision for inference speedup
 - Enable layer fusion and kernel auto-tuning
 - Use dynamic shapes for variable batch sizes
-- Build engine with: trtexec --onnx=model.onnx --saveEngine=model.trt --fp16
-
-## NVLink Configuration
+- Build engine with: trtexec --onnx=model.onnx --saveEngine=model.trt --fp16`,
+    nvlink: `## NVLink Configuration
 - Check NVLink status: nvidia-smi nvlink -s
 - NVLink provides up to 600 GB/s bidirectional bandwidth on H100
-- Enable peer-to-peer: cudaDeviceEnablePeerAccess()
-`;
+- Enable peer-to-peer: cudaDeviceEnablePeerAccess()`,
+};
+
+type DocsSection = keyof typeof NVIDIA_DOCS_SECTIONS;
+
+// Sections sent for each query type; types not listed get the full context
+const DOCS_SECTIONS_BY_TYPE: Record<string, DocsSection[]> = {
+    mig_config: ['mig'],
+    cuda_general: ['cuda'],
+    cuda_profiling: ['cuda'],
+    tensorrt: ['tensorrt'],
+    nvlink: ['nvlink'],
+};
 
 interface QueryRequest {
     query: string;
     n_results?: number;
     include_code_examples?: boolean;
+    stream?: boolean; // Respond with NDJSON answer deltas instead of a single JSON body
 }
 
 interface Source {
@@ -113,16 +181,16 @@ interface QueryResponse {
     answer: string;
     query_type: string;
     confidence: number;
-    sources: Source[];
-    code_examples: CodeExample[];
-    matched_keywords: string[];
-    suggested_tags: string[];
+    sources: readonly Source[];
+    code_examples: readonly CodeExample[];
+    matched_keywords: readonly string[];
+    suggested_tags: readonly string[];
     llm_info: {
         provider: string;
         model: string;
         is_nvidia: boolean;
     };
-    nvidia_technologies: string[];
+    nvidia_technologies: readonly string[];
 }
 
 interface CodeExample {
@@ -133,91 +201,130 @@ interface CodeExample {
     description: string;
 }
 
-// Route the query to determine type
-function routeQuery(query: string): { type: string; confidence: number; keywords: string[]; tags: string[] } {
-    const lowerQuery = query.toLowerCase();
-
-    const routingRules = [
-        { type: 'mig_config', keywords: ['mig', 'multi-instance', 'partition', 'gpu instance'], tags: ['MIG', 'A100', 'Configuration'] },
-        { type: 'cuda_general', keywords: ['cuda', 'kernel', 'thread', 'block', 'shared memory', 'global memory'], tags: ['CUDA', 'Programming'] },
-        { type: 'cuda_profiling', keywords: ['nsight', 'profil', 'nvprof', 'performance', 'slow', 'optimize'], tags: ['Profiling', 'Performance'] },
-        { type: 'tensorrt', keywords: ['tensorrt', 'trt', 'inference', 'fp16', 'int8', 'quantiz'], tags: ['TensorRT', 'Inference'] },
-        { type: 'nvlink', keywords: ['nvlink', 'multi-gpu', 'peer', 'p2p', 'interconnect'], tags: ['NVLink', 'Multi-GPU'] },
-        { type: 'nemo', keywords: ['nemo', 'megatron', 'llm', 'transformer'], tags: ['NeMo', 'LLM'] },
-        { type: 'triton', keywords: ['triton', 'inference server', 'model serving'], tags: ['Triton', 'Serving'] },
-    ];
+// Routing decision; every result has this one fixed shape, whichever branch built it
+interface RouteResult {
+    readonly type: string;
+    readonly confidence: number;
+    readonly keywords: readonly string[];
+    readonly tags: readonly string[];
+}
 
-    for (const rule of routingRules) {
-        const matchedKeywords = rule.keywords.filter(kw => lowerQuery.includes(kw));
-        if (matchedKeywords.length > 0) {
-            return {
-                type: rule.type,
-                confidence: Math.min(0.9, 0.5 + matchedKeywords.length * 0.15),
-                keywords: matchedKeywords,
-                tags: rule.tags
-            };
+// Utility: Escape a literal keyword for use inside a RegExp
+function escapeRegExp(text: string): string {
+    return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+// Routing rules in priority order. Each rule's keywords are compiled into a single
+// alternation at module load, so a rule that doesn't match costs one regex test.
+const ROUTING_RULES = [
+    { type: 'mig_config', keywords: ['mig', 'multi-instance', 'partition', 'gpu instance'], tags: ['MIG', 'A100', 'Configuration'] },
+    { type: 'cuda_general', keywords: ['cuda', 'kernel', 'thread', 'block', 'shared memory', 'global memory'], tags: ['CUDA', 'Programming'] },
+    { type: 'cuda_profiling', keywords: ['nsight', 'profil', 'nvprof', 'performance', 'slow', 'optimize'], tags: ['Profiling', 'Performance'] },
+    { type: 'tensorrt', keywords: ['tensorrt', 'trt', 'inference', 'fp16', 'int8', 'quantiz'], tags: ['TensorRT', 'Inference'] },
+    { type: 'nvlink', keywords: ['nvlink', 'multi-gpu', 'peer', 'p2p', 'interconnect'], tags: ['NVLink', 'Multi-GPU'] },
+    { type: 'nemo', keywords: ['nemo', 'megatron', 'llm', 'transformer'], tags: ['NeMo', 'LLM'] },
+    { type: 'triton', keywords: ['triton', 'inference server', 'model serving'], tags: ['Triton', 'Serving'] },
+].map(rule => Object.freeze({
+    type: rule.type,
+    // Frozen because tags are handed to every response by reference
+    keywords: Object.freeze(rule.keywords),
+    tags: Object.freeze(rule.tags),
+    pattern: new RegExp(rule.keywords.map(escapeRegExp).join('|')),
+}));
+
+// Fallback route for queries that match no rule, shared by every such response
+const GENERIC_ROUTE: RouteResult = Object.freeze({
+    type: 'generic',
+    confidence: 0.5,
+    keywords: Object.freeze([]),
+    tags: Object.freeze(['General']),
+});
+
+// Route the query to determine type (expects the already-lowercased query)
+function routeQuery(lowerQuery: string): RouteResult {
+    for (const rule of ROUTING_RULES) {
+        if (!rule.pattern.test(lowerQuery)) {
+            continue;
         }
+
+        // Only the winning rule pays for collecting its individual keyword hits
+        const matchedKeywords = rule.keywords.filter(kw => lowerQuery.includes(kw));
+        return {
+            type: rule.type,
+            confidence: Math.min(0.9, 0.5 + matchedKeywords.length * 0.15),
+            keywords: matchedKeywords,
+            tags: rule.tags
+        };
     }
 
-    return { type: 'generic', confidence: 0.5, keywords: [], tags: ['General'] };
+    return GENERIC_ROUTE;
 }
 
-// Get relevant sources based on query type
-function getSources(queryType: string): Source[] {
-    const sourceMap: Record<string, Source[]> = {
-        mig_config: [
-            { title: 'NVIDIA MIG User Guide', url: 'https://docs.nvidia.com/datacenter/tesla/mig-user-guide/', relevance: 0.95 },
-            { title: 'A100 GPU Architecture', url: 'https://www.nvidia.com/en-us/data-center/a100/', relevance: 0.85 },
-        ],
-        cuda_general: [
-            { title: 'CUDA C++ Programming Guide', url: 'https://docs.nvidia.com/cuda/cuda-c-programming-guide/', relevance: 0.95 },
-            { title: 'CUDA Best Practices Guide', url: 'https://docs.nvidia.com/cuda/cuda-c-best-practices-guide/', relevance: 0.90 },
-        ],
-        cuda_profiling: [
-            { title: 'Nsight Systems User Guide', url: 'https://docs.nvidia.com/nsight-systems/', relevance: 0.95 },
-            { title: 'Nsight Compute Documentation', url: 'https://docs.nvidia.com/nsight-compute/', relevance: 0.90 },
-        ],
-        tensorrt: [
-            { title: 'TensorRT Developer Guide', url: 'https://docs.nvidia.com/deeplearning/tensorrt/developer-guide/', relevance: 0.95 },
-            { title: 'TensorRT Quick Start', url: 'https://docs.nvidia.com/deeplearning/tensorrt/quick-start-guide/', relevance: 0.85 },
-        ],
-        nvlink: [
-            { title: 'NVLink and NVSwitch', url: 'https://www.nvidia.com/en-us/data-center/nvlink/', relevance: 0.95 },
-            { title: 'Multi-GPU Programming', url: 'https://docs.nvidia.com/cuda/cuda-c-programming-guide/index.html#multi-device-system', relevance: 0.85 },
-        ],
-        nemo: [
-            { title: 'NVIDIA NeMo Framework', url: 'https://docs.nvidia.com/nemo-framework/', relevance: 0.95 },
-            { title: 'NeMo GitHub', url: 'https://github.com/NVIDIA/NeMo', relevance: 0.85 },
-        ],
-        triton: [
-            { title: 'Triton Inference Server', url: 'https://docs.nvidia.com/deeplearning/triton-inference-server/', relevance: 0.95 },
-            { title: 'Triton GitHub', url: 'https://github.com/triton-inference-server/server', relevance: 0.85 },
-        ],
-        generic: [
-            { title: 'NVIDIA Developer Documentation', url: 'https://developer.nvidia.com/documentation', relevance: 0.70 },
-            { title: 'NVIDIA NGC Catalog', url: 'https://catalog.ngc.nvidia.com/', relevance: 0.65 },
-        ],
-    };
-
-    return sourceMap[queryType] || sourceMap.generic;
+// Utility: Deep-freeze a lookup table whose lists are shared by every response
+function freezeTable<T extends object>(table: Record<string, T[]>): Readonly<Record<string, readonly T[]>> {
+    for (const items of Object.values(table)) {
+        items.forEach(item => Object.freeze(item));
+        Object.freeze(items);
+    }
+    return Object.freeze(table);
 }
 
-function generateMockAnswer(query: string, queryType: string, sources: Source[]): string {
-    const typeIntros: Record<string, string> = {
-        mig_config: "Based on NVIDIA's MIG documentation:\n\n",
-        cuda_general: "From the CUDA programming guide:\n\n",
-        cuda_profiling: "According to NVIDIA profiling documentation:\n\n",
-        tensorrt: "Based on TensorRT documentation:\n\n",
-        nvlink: "From NVIDIA's NVLink documentation:\n\n",
-        nemo: "According to NeMo framework documentation:\n\n",
-        triton: "From Triton Inference Server docs:\n\n",
-        generic: "Based on NVIDIA documentation:\n\n",
-    };
+// Documentation sources per query type (built once at module load)
+const SOURCE_MAP = freezeTable<Source>({
+    mig_config: [
+        { title: 'NVIDIA MIG User Guide', url: 'https://docs.nvidia.com/datacenter/tesla/mig-user-guide/', relevance: 0.95 },
+        { title: 'A100 GPU Architecture', url: 'https://www.nvidia.com/en-us/data-center/a100/', relevance: 0.85 },
+    ],
+    cuda_general: [
+        { title: 'CUDA C++ Programming Guide', url: 'https://docs.nvidia.com/cuda/cuda-c-programming-guide/', relevance: 0.95 },
+        { title: 'CUDA Best Practices Guide', url: 'https://docs.nvidia.com/cuda/cuda-c-best-practices-guide/', relevance: 0.90 },
+    ],
+    cuda_profiling: [
+        { title: 'Nsight Systems User Guide', url: 'https://docs.nvidia.com/nsight-systems/', relevance: 0.95 },
+        { title: 'Nsight Compute Documentation', url: 'https://docs.nvidia.com/nsight-compute/', relevance: 0.90 },
+    ],
+    tensorrt: [
+        { title: 'TensorRT Developer Guide', url: 'https://docs.nvidia.com/deeplearning/tensorrt/developer-guide/', relevance: 0.95 },
+        { title: 'TensorRT Quick Start', url: 'https://docs.nvidia.com/deeplearning/tensorrt/quick-start-guide/', relevance: 0.85 },
+    ],
+    nvlink: [
+        { title: 'NVLink and NVSwitch', url: 'https://www.nvidia.com/en-us/data-center/nvlink/', relevance: 0.95 },
+        { title: 'Multi-GPU Programming', url: 'https://docs.nvidia.com/cuda/cuda-c-programming-guide/index.html#multi-device-system', relevance: 0.85 },
+    ],
+    nemo: [
+        { title: 'NVIDIA NeMo Framework', url: 'https://docs.nvidia.com/nemo-framework/', relevance: 0.95 },
+        { title: 'NeMo GitHub', url: 'https://github.com/NVIDIA/NeMo', relevance: 0.85 },
+    ],
+    triton: [
+        { title: 'Triton Inference Server', url: 'https://docs.nvidia.com/deeplearning/triton-inference-server/', relevance: 0.95 },
+        { title: 'Triton GitHub', url: 'https://github.com/triton-inference-server/server', relevance: 0.85 },
+    ],
+    generic: [
+        { title: 'NVIDIA Developer Documentation', url: 'https://developer.nvidia.com/documentation', relevance: 0.70 },
+        { title: 'NVIDIA NGC Catalog', url: 'https://catalog.ngc.nvidia.com/', relevance: 0.65 },
+    ],
+});
 
-    let answer = typeIntros[queryType] || typeIntros.generic;
+// Get relevant sources based on query type
+function getSources(queryType: string): readonly Source[] {
+    return SOURCE_MAP[queryType] || SOURCE_MAP.generic;
+}
 
-    if (queryType === 'mig_config') {
-        answer += `**MIG Configuration Steps:**
+// Answer openers per query type for the mock (no LLM) path
+const TYPE_INTROS: Record<string, string> = {
+    mig_config: "Based on NVIDIA's MIG documentation:\n\n",
+    cuda_general: "From the CUDA programming guide:\n\n",
+    cuda_profiling: "According to NVIDIA profiling documentation:\n\n",
+    tensorrt: "Based on TensorRT documentation:\n\n",
+    nvlink: "From NVIDIA's NVLink documentation:\n\n",
+    nemo: "According to NeMo framework documentation:\n\n",
+    triton: "From Triton Inference Server docs:\n\n",
+    generic: "Based on NVIDIA documentation:\n\n",
+};
+
+// Mock answer bodies for query types whose text doesn't depend on the query
+const MOCK_ANSWER_BODIES: Record<string, string> = {
+    mig_config: `**MIG Configuration Steps:**
 
 1. **Enable MIG mode** on your A100/A30/H100 GPU:
    \`\`\`bash
@@ -239,9 +346,8 @@ function generateMockAnswer(query: string, queryType: string, sources: Source[])
    nvidia-smi -L
    \`\`\`
 
-**Available profiles for A100-40GB:** 1g.5gb, 2g.10gb, 3g.20gb, 4g.20gb, 7g.40gb`;
-    } else if (queryType === 'cuda_profiling') {
-        answer += `**Debugging Slow CUDA Kernels:**
+**Available profiles for A100-40GB:** 1g.5gb, 2g.10gb, 3g.20gb, 4g.20gb, 7g.40gb`,
+    cuda_profiling: `**Debugging Slow CUDA Kernels:**
 
 1. **Profile with Nsight Systems** to get overall timeline:
    \`\`\`bash
@@ -262,9 +368,8 @@ function generateMockAnswer(query: string, queryType: string, sources: Source[])
 4. **Quick fixes:**
    - Increase block size for better occupancy
    - Use shared memory for repeated accesses
-   - Ensure aligned memory accesses`;
-    } else if (queryType === 'tensorrt') {
-        answer += `**TensorRT Optimization Guide:**
+   - Ensure aligned memory accesses`,
+    tensorrt: `**TensorRT Optimization Guide:**
 
 1. **Convert your model to TensorRT**:
    \`\`\`bash
@@ -279,9 +384,8 @@ function generateMockAnswer(query: string, queryType: string, sources: Source[])
 3. **Key optimizations:**
    - Layer fusion reduces memory bandwidth
    - Kernel auto-tuning finds optimal algorithms
-   - Dynamic shapes for variable batch sizes`;
-    } else if (queryType === 'cuda_general') {
-        answer += `**CUDA Programming Best Practices:**
+   - Dynamic shapes for variable batch sizes`,
+    cuda_general: `**CUDA Programming Best Practices:**
 
 1. **Memory hierarchy optimization:**
    - Global memory: ~900 GB/s (A100)
@@ -297,79 +401,401 @@ function generateMockAnswer(query: string, queryType: string, sources: Source[])
 
 3. **Coalesced memory access:**
    - Consecutive threads should access consecutive memory
-   - Align data to 128-byte boundaries`;
-    } else {
-        answer += `I found relevant information for your query about "${query}".\n\n`;
-        answer += `Please refer to the official documentation for detailed guidance.\n\n`;
+   - Align data to 128-byte boundaries`,
+};
+
+// Markdown source list appended to each mock answer, rendered once per query type
+const SOURCE_LISTS: Record<string, string> = Object.fromEntries(
+    Object.entries(SOURCE_MAP).map(([type, sources]) => [
+        type,
+        `\n\n**📚 Sources:**\n${sources.map((s, i) => `${i + 1}. [${s.title}](${s.url})\n`).join('')}`,
+    ])
+);
+
+// Complete mock answers for the fixed-text query types, assembled at module load
+const STATIC_MOCK_ANSWERS: Record<string, string> = Object.fromEntries(
+    Object.entries(MOCK_ANSWER_BODIES).map(([type, body]) => [type, TYPE_INTROS[type] + body + SOURCE_LISTS[type]])
+);
+
+function generateMockAnswer(query: string, queryType: string): string {
+    const staticAnswer = STATIC_MOCK_ANSWERS[queryType];
+    if (staticAnswer) {
+        return staticAnswer;
+    }
+
+    return [
+        TYPE_INTROS[queryType] || TYPE_INTROS.generic,
+        `I found relevant information for your query about "${query}".\n\n`,
+        `Please refer to the official documentation for detailed guidance.\n\n`,
+        SOURCE_LISTS[queryType] || SOURCE_LISTS.generic,
+    ].join('');
+}
+
+// Sample repositories per query type (built once at module load)
+const CODE_EXAMPLES = freezeTable<CodeExample>({
+    cuda_general: [
+        {
+            name: 'vectorAdd.cu',
+            path: 'samples/vectorAdd',
+            repo: 'NVIDIA/cuda-samples',
+            url: 'https://github.com/NVIDIA/cuda-samples/tree/master/Samples/0_Introduction/vectorAdd',
+            description: 'Basic CUDA vector addition example'
+        }
+    ],
+    tensorrt: [
+        {
+            name: 'trtexec',
+            path: 'samples/trtexec',
+            repo: 'NVIDIA/TensorRT',
+            url: 'https://github.com/NVIDIA/TensorRT/tree/main/samples/trtexec',
+            description: 'TensorRT command-line wrapper'
+        }
+    ],
+    mig_config: [
+        {
+            name: 'mig-parted',
+            path: '/',
+            repo: 'NVIDIA/mig-parted',
+            url: 'https://github.com/NVIDIA/mig-parted',
+            description: 'MIG partition editor for Kubernetes'
+        }
+    ],
+    cuda_profiling: [
+        {
+            name: 'Nsight Systems Examples',
+            path: 'samples',
+            repo: 'NVIDIA/nsight-systems',
+            url: 'https://docs.nvidia.com/nsight-systems/UserGuide/index.html',
+            description: 'Profiling examples and tutorials'
+        }
+    ],
+});
+
+// Shared empty result for query types without examples
+const NO_CODE_EXAMPLES: readonly CodeExample[] = Object.freeze([]);
+
+function getCodeExamples(queryType: string): readonly CodeExample[] {
+    return CODE_EXAMPLES[queryType] || NO_CODE_EXAMPLES;
+}
+
+// Retry on timeout, rate limit, or server errors (one case-insensitive pass over the message)
+const RETRYABLE_ERROR_PATTERN = /timeout|rate limit|429|50[0234]|network|econnreset/i;
+
+// Helper function to determine if error is retryable
+function isRetryableError(error: unknown): boolean {
+    return error instanceof Error && RETRYABLE_ERROR_PATTERN.test(error.message);
+}
+
+// Utility: Delay requested by the server (Retry-After on 429/503), if any
+function getRetryAfterMs(error: unknown): number | null {
+    const headers = (error as { headers?: Record<string, string | null | undefined> } | null)?.headers;
+    if (!headers) {
+        return null;
+    }
+
+    const retryAfterMs = Number(headers['retry-after-ms']);
+    if (headers['retry-after-ms'] && !Number.isNaN(retryAfterMs)) {
+        return retryAfterMs;
+    }
+
+    const retryAfter = headers['retry-after'];
+    if (!retryAfter) {
+        return null;
     }
 
-    answer += `\n\n**📚 Sources:**\n`;
-    sources.forEach((s, i) => {
-        answer += `${i + 1}. [${s.title}](${s.url})\n`;
+    // Either delta-seconds or an HTTP date
+    const seconds = Number(retryAfter);
+    if (!Number.isNaN(seconds)) {
+        return seconds * 1000;
+    }
+    const retryAt = Date.parse(retryAfter);
+    return Number.isNaN(retryAt) ? null : Math.max(0, retryAt - Date.now());
+}
+
+// Created on first use and shared by every request served by this instance.
+// The SDK is imported lazily so mock-only deployments never load it.
+let nimClient: Promise<OpenAI> | null = null;
+
+function getNimClient(): Promise<OpenAI> {
+    if (!nimClient) {
+        nimClient = import('openai')
+            .then(({ default: OpenAIClient }) => new OpenAIClient({
+                baseURL: NVIDIA_BASE_URL,
+                apiKey: NVIDIA_API_KEY,
+                timeout: API_TIMEOUT_MS,
+                maxRetries: 0, // We handle retries ourselves
+            }))
+            .catch((error) => {
+                nimClient = null; // Allow the next request to retry the import
+                throw error;
+            });
+    }
+    return nimClient;
+}
+
+// Utility: System message carrying the prompt plus the given documentation sections
+function buildNimSystemMessage(sections: readonly DocsSection[]) {
+    const context = sections.map(section => NVIDIA_DOCS_SECTIONS[section]).join('\n\n');
+    return Object.freeze({
+        role: 'system' as const,
+        content: `${SYSTEM_PROMPT}\n\nContext from NVIDIA documentation:\n${context}`,
     });
+}
 
-    return answer;
+// Everything in the NIM prompt except the question itself is fixed per query type,
+// so it is assembled once at module load. The documentation context lives in the
+// system message so requests of the same type share one identical prefix, which
+// lets the endpoint reuse its prompt cache instead of re-processing the context.
+const DEFAULT_NIM_SYSTEM_MESSAGE = buildNimSystemMessage(Object.keys(NVIDIA_DOCS_SECTIONS) as DocsSection[]);
+const NIM_SYSTEM_MESSAGES = Object.fromEntries(
+    Object.entries(DOCS_SECTIONS_BY_TYPE).map(([type, sections]) => [type, buildNimSystemMessage(sections)])
+);
+const NIM_USER_PREFIX = 'User Question: ';
+
+// Chat messages sent to NIM for a user question
+function buildNimMessages(query: string, queryType: string) {
+    return [
+        NIM_SYSTEM_MESSAGES[queryType] ?? DEFAULT_NIM_SYSTEM_MESSAGE,
+        { role: 'user' as const, content: NIM_USER_PREFIX + query }
+    ];
 }
 
-function getCodeExamples(queryType: string): CodeExample[] {
-    const examples: Record<string, CodeExample[]> = {
-        cuda_general: [
-            {
-                name: 'vectorAdd.cu',
-                path: 'samples/vectorAdd',
-                repo: 'NVIDIA/cuda-samples',
-                url: 'https://github.com/NVIDIA/cuda-samples/tree/master/Samples/0_Introduction/vectorAdd',
-                description: 'Basic CUDA vector addition example'
+// Utility: Delay before retrying a failed NIM call, or null to give up
+function getRetryDelayMs(error: unknown, attempt: number): number | null {
+    const lastError = error as Error;
+    const isRetryable = isRetryableError(error);
+
+    // Log error without exposing API key
+    console.error(`NVIDIA NIM API error (attempt ${attempt}/${MAX_RETRIES}):`, {
+        message: lastError.message,
+        name: lastError.name,
+        retryable: isRetryable,
+    });
+
+    const retryAfterMs = getRetryAfterMs(error);
+
+    // Fall back to the mock answer rather than stall the request on a long server-side wait
+    if (!isRetryable || attempt === MAX_RETRIES ||
+        (retryAfterMs !== null && retryAfterMs > MAX_RETRY_AFTER_MS)) {
+        return null;
+    }
+
+    // Honor the server's Retry-After, otherwise exponential backoff with jitter
+    return retryAfterMs ?? RETRY_DELAY_MS * Math.pow(2, attempt - 1) + Math.random() * 1000;
+}
+
+// Stream answer tokens from NVIDIA NIM. Failures before the first token are retried
+// like fetchNimAnswer; after that the request can't be replayed transparently, so
+// the error is passed on. Each attempt is aborted if no chunk arrives within
+// STREAM_IDLE_TIMEOUT_MS, and the whole answer is capped at STREAM_MAX_DURATION_MS.
+async function* streamNimAnswer(query: string, queryType: string, signal: AbortSignal): AsyncGenerator<string> {
+    const deadline = Date.now() + STREAM_MAX_DURATION_MS;
+
+    for (let attempt = 1; ; attempt++) {
+        signal.throwIfAborted();
+
+        const controller = new AbortController();
+        const abort = () => controller.abort();
+        signal.addEventListener('abort', abort);
+        let idleTimeoutId = setTimeout(abort, STREAM_IDLE_TIMEOUT_MS);
+        const deadlineTimeoutId = setTimeout(abort, deadline - Date.now());
+
+        let started = false;
+        let retryDelayMs = 0;
+        try {
+            const client = await getNimClient();
+            const stream = await client.chat.completions.create({
+                model: NVIDIA_MODEL,
+                messages: buildNimMessages(query, queryType),
+                temperature: 0.6,
+                top_p: 0.7,
+                max_tokens: 4096,
+                stream: true,
+            }, {
+                signal: controller.signal,
+            });
+
+            for await (const chunk of stream) {
+                clearTimeout(idleTimeoutId);
+                idleTimeoutId = setTimeout(abort, STREAM_IDLE_TIMEOUT_MS);
+
+                const delta = chunk.choices[0]?.delta?.content;
+                if (delta) {
+                    started = true;
+                    yield delta;
+                }
             }
-        ],
-        tensorrt: [
-            {
-                name: 'trtexec',
-                path: 'samples/trtexec',
-                repo: 'NVIDIA/TensorRT',
-                url: 'https://github.com/NVIDIA/TensorRT/tree/main/samples/trtexec',
-                description: 'TensorRT command-line wrapper'
+
+            // The SDK ends the iteration quietly when its signal aborts, so surface our
+            // own idle/deadline aborts as an error: it is retried before the first token
+            // and reported as an interrupted (uncached) answer after it
+            if (controller.signal.aborted && !signal.aborted) {
+                throw new Error('NVIDIA NIM stream timeout');
             }
-        ],
-        mig_config: [
-            {
-                name: 'mig-parted',
-                path: '/',
-                repo: 'NVIDIA/mig-parted',
-                url: 'https://github.com/NVIDIA/mig-parted',
-                description: 'MIG partition editor for Kubernetes'
+            return;
+
+        } catch (error) {
+            if (started || signal.aborted) {
+                throw error;
             }
-        ],
-        cuda_profiling: [
-            {
-                name: 'Nsight Systems Examples',
-                path: 'samples',
-                repo: 'NVIDIA/nsight-systems',
-                url: 'https://docs.nvidia.com/nsight-systems/UserGuide/index.html',
-                description: 'Profiling examples and tutorials'
+            const delay = getRetryDelayMs(error, attempt);
+            if (delay === null || Date.now() + delay >= deadline) {
+                throw error;
             }
-        ],
-    };
+            retryDelayMs = delay;
+
+        } finally {
+            clearTimeout(idleTimeoutId);
+            clearTimeout(deadlineTimeoutId);
+            signal.removeEventListener('abort', abort);
+        }
 
-    return examples[queryType] || [];
+        await sleep(retryDelayMs);
+    }
 }
 
-// Helper function to determine if error is retryable
-function isRetryableError(error: unknown): boolean {
-    if (error instanceof Error) {
-        const message = error.message.toLowerCase();
-        // Retry on timeout, rate limit, or server errors
-        return message.includes('timeout') ||
-            message.includes('rate limit') ||
-            message.includes('429') ||
-            message.includes('500') ||
-            message.includes('502') ||
-            message.includes('503') ||
-            message.includes('504') ||
-            message.includes('network') ||
-            message.includes('econnreset');
+// Call NVIDIA NIM with retry logic and timeout; resolves to null once all attempts fail
+async function fetchNimAnswer(query: string, queryType: string): Promise<string | null> {
+    for (let attempt = 1; attempt <= MAX_RETRIES; attempt++) {
+        try {
+            const client = await getNimClient();
+
+            // Create AbortController for timeout
+            const controller = new AbortController();
+            const timeoutId = setTimeout(() => controller.abort(), API_TIMEOUT_MS);
+
+            try {
+                const completion = await client.chat.completions.create({
+                    model: NVIDIA_MODEL,
+                    messages: buildNimMessages(query, queryType),
+                    temperature: 0.6,
+                    top_p: 0.7,
+                    max_tokens: 4096,
+                }, {
+                    signal: controller.signal as AbortSignal,
+                });
+
+                clearTimeout(timeoutId);
+                return completion.choices[0]?.message?.content || '';
+
+            } catch (innerError) {
+                clearTimeout(timeoutId);
+                throw innerError;
+            }
+
+        } catch (error) {
+            const retryDelayMs = getRetryDelayMs(error, attempt);
+            if (retryDelayMs === null) {
+                break;
+            }
+            await sleep(retryDelayMs);
+        }
     }
-    return false;
+
+    return null;
+}
+
+// Provider metadata only depends on whether NIM produced the answer, so each variant
+// is built once and shared by every response
+const NIM_LLM_INFO = Object.freeze({ provider: 'nvidia_nim', model: NVIDIA_MODEL, is_nvidia: true });
+const MOCK_LLM_INFO = Object.freeze({ provider: 'mock', model: 'none', is_nvidia: false });
+const NIM_TECHNOLOGIES = Object.freeze(['nim', 'cuda']);
+const MOCK_TECHNOLOGIES = Object.freeze(['cuda']);
+
+// Assemble the response payload; fromNim is false when the answer came from the mock path
+function buildQueryResponse(
+    query: string,
+    routing: RouteResult,
+    answer: string,
+    fromNim: boolean,
+    includeCodeExamples: boolean
+): QueryResponse {
+    return {
+        query,
+        answer,
+        query_type: routing.type,
+        confidence: routing.confidence,
+        sources: getSources(routing.type),
+        code_examples: includeCodeExamples ? getCodeExamples(routing.type) : NO_CODE_EXAMPLES,
+        matched_keywords: routing.keywords,
+        suggested_tags: routing.tags,
+        llm_info: fromNim ? NIM_LLM_INFO : MOCK_LLM_INFO,
+        nvidia_technologies: fromNim ? NIM_TECHNOLOGIES : MOCK_TECHNOLOGIES,
+    };
+}
+
+// Stream a fresh NIM answer as NDJSON: {"delta": "..."} lines as tokens arrive, then one
+// {"done": true, "response": {...}} line carrying the same payload the JSON path returns
+function streamQueryResponse(
+    query: string,
+    routing: RouteResult,
+    cacheKey: string,
+    includeCodeExamples: boolean,
+    headers: Headers
+): Response {
+    const encoder = new TextEncoder();
+    const upstream = new AbortController();
+    let cancelled = false;
+
+    const body = new ReadableStream<Uint8Array>({
+        async start(controller) {
+            const send = (event: object) => {
+                if (!cancelled) {
+                    controller.enqueue(encoder.encode(JSON.stringify(event) + '\n'));
+                }
+            };
+            let answer = '';
+            let complete = false;
+            try {
+                for await (const delta of streamNimAnswer(query, routing.type, upstream.signal)) {
+                    answer += delta;
+                    send({ delta });
+                }
+                complete = true;
+            } catch (error) {
+                // Log error without exposing API key
+                const streamError = error as Error;
+                console.error('NVIDIA NIM streaming error:', {
+                    message: streamError.message,
+                    name: streamError.name,
+                });
+            }
+
+            if (cancelled) {
+                return;
+            }
+
+            // A stream cut off mid-answer keeps the text the user already saw; only
+            // complete answers are cached
+            const fromNim = complete || answer !== '';
+            if (complete) {
+                if (answer && cacheKey) {
+                    answerCache.set(cacheKey, answer);
+                }
+            } else if (answer) {
+                console.warn('NVIDIA NIM stream interrupted; returning partial answer');
+            } else {
+                // Fallback to mock answer when NIM produced nothing
+                answer = generateMockAnswer(query, routing.type);
+                console.warn('Falling back to mock response after streaming failure');
+            }
+
+            send({
+                done: true,
+                response: buildQueryResponse(query, routing, answer || 'Unable to generate response.', fromNim, includeCodeExamples),
+            });
+            controller.close();
+        },
+        cancel() {
+            // Client went away; stop generating tokens nobody will read
+            cancelled = true;
+            upstream.abort();
+        },
+    });
+
+    headers.set('Content-Type', 'application/x-ndjson; charset=utf-8');
+    headers.set('Cache-Control', 'no-cache');
+    return new Response(body, { headers });
 }
 
 export async function POST(request: NextRequest) {
@@ -383,17 +809,28 @@ export async function POST(request: NextRequest) {
         const rateLimit = checkRateLimit(clientId);
 
         if (!rateLimit.allowed) {
+            return new NextResponse(RATE_LIMITED_BODY, {
+                status: 429,
+                headers: RATE_LIMITED_HEADERS,
+            });
+        }
+
+        // Refuse oversized payloads before buffering and parsing them; anything past
+        // MAX_QUERY_LENGTH would be thrown away by sanitizeInput anyway. A declared
+        // Content-Length fails fast, and the read itself stops at the same limit.
+        const contentLength = Number(request.headers.get('content-length'));
+        const bodyText = contentLength > MAX_BODY_BYTES
+            ? null
+            : await readBodyText(request, MAX_BODY_BYTES);
+        if (bodyText === null) {
             return NextResponse.json(
-                { error: 'Rate limit exceeded. Please try again later.' },
-                {
-                    status: 429,
-                    headers: { 'Retry-After': '60' }
-                }
+                { error: 'Request body too large' },
+                { status: 413 }
             );
         }
 
-        const body: QueryRequest = await request.json();
-        const { query: rawQuery, include_code_examples = true } = body;
+        const body: QueryRequest = JSON.parse(bodyText);
+        const { query: rawQuery, include_code_examples = true, stream = false } = body;
 
         // Input validation and sanitization
         if (!rawQuery || typeof rawQuery !== 'string') {
@@ -412,117 +849,65 @@ export async function POST(request: NextRequest) {
             );
         }
 
+        // Lowercase once; routing and the cache key both work on this copy
+        const lowerQuery = query.toLowerCase();
+
         // Route the query
-        const routing = routeQuery(query);
-
-        // Get relevant sources
-        const sources = getSources(routing.type);
-
-        let answer: string = '';
-        let llmProvider = 'mock';
-        let llmModel = 'none';
-        let isNvidia = false;
-        let latencyMs = 0;
-
-        // Try NVIDIA NIM API with retry logic and timeout
-        if (NVIDIA_API_KEY) {
-            let lastError: Error | null = null;
-
-            for (let attempt = 1; attempt <= MAX_RETRIES; attempt++) {
-                try {
-                    const client = new OpenAI({
-                        baseURL: NVIDIA_BASE_URL,
-                        apiKey: NVIDIA_API_KEY,
-                        timeout: API_TIMEOUT_MS,
-                        maxRetries: 0, // We handle retries ourselves
-                    });
-
-                    // Create AbortController for timeout
-                    const controller = new AbortController();
-                    const timeoutId = setTimeout(() => controller.abort(), API_TIMEOUT_MS);
-
-                    try {
-                        const completion = await client.chat.completions.create({
-                            model: NVIDIA_MODEL,
-                            messages: [
-                                { role: 'system', content: SYSTEM_PROMPT },
-                                { role: 'user', content: `Context from NVIDIA documentation:\n${NVIDIA_DOCS_CONTEXT}\n\nUser Question: ${query}` }
-                            ],
-                            temperature: 0.6,
-                            top_p: 0.7,
-                            max_tokens: 4096,
-                        }, {
-                            signal: controller.signal as AbortSignal,
-                        });
-
-                        clearTimeout(timeoutId);
-                        answer = completion.choices[0]?.message?.content || 'Unable to generate response.';
-                        llmProvider = 'nvidia_nim';
-                        llmModel = NVIDIA_MODEL;
-                        isNvidia = true;
-                        latencyMs = Date.now() - startTime;
-                        lastError = null;
-                        break; // Success, exit retry loop
-
-                    } catch (innerError) {
-                        clearTimeout(timeoutId);
-                        throw innerError;
-                    }
-
-                } catch (error) {
-                    lastError = error as Error;
-                    const isRetryable = isRetryableError(error);
-
-                    // Log error without exposing API key
-                    console.error(`NVIDIA NIM API error (attempt ${attempt}/${MAX_RETRIES}):`, {
-                        message: lastError.message,
-                        name: lastError.name,
-                        retryable: isRetryable,
-                    });
-
-                    if (!isRetryable || attempt === MAX_RETRIES) {
-                        break;
-                    }
-
-                    // Exponential backoff with jitter
-                    const backoffDelay = RETRY_DELAY_MS * Math.pow(2, attempt - 1) + Math.random() * 1000;
-                    await sleep(backoffDelay);
+        const routing = routeQuery(lowerQuery);
+
+        let answer: string;
+        let fromNim = false; // Set when the answer came from NIM
+
+        const normalizedQuery = normalizeQuery(lowerQuery);
+        const cacheKey = normalizedQuery && `${routing.type}:${normalizedQuery}`;
+        const cached = NVIDIA_API_KEY && cacheKey ? answerCache.get(cacheKey) : undefined;
+
+        // Add performance headers
+        const headers = new Headers();
+        headers.set('X-Rate-Limit-Remaining', String(rateLimit.remaining));
+        headers.set('X-Cache', cached ? 'HIT' : 'MISS');
+
+        if (stream && NVIDIA_API_KEY && !cached) {
+            // Time to first byte; the body keeps streaming after this
+            headers.set('X-Response-Time', `${Date.now() - startTime}ms`);
+            return streamQueryResponse(query, routing, cacheKey, include_code_examples, headers);
+        }
+
+        if (cached) {
+            answer = cached;
+            fromNim = true;
+        } else if (NVIDIA_API_KEY) {
+            // Concurrent requests for the same question share a single NIM call
+            let pending = inFlightAnswers.get(cacheKey);
+            if (!pending) {
+                pending = fetchNimAnswer(query, routing.type);
+                if (cacheKey) {
+                    inFlightAnswers.set(cacheKey, pending);
+                    pending.then(() => inFlightAnswers.delete(cacheKey));
                 }
             }
 
-            if (lastError) {
+            const nimAnswer = await pending;
+
+            if (nimAnswer !== null) {
+                answer = nimAnswer || 'Unable to generate response.';
+                fromNim = true;
+
+                if (cacheKey && nimAnswer) {
+                    answerCache.set(cacheKey, answer);
+                }
+            } else {
                 // Fallback to mock answer on API failure
-                answer = generateMockAnswer(query, routing.type, sources);
+                answer = generateMockAnswer(query, routing.type);
                 console.warn('Falling back to mock response after API failures');
             }
         } else {
-            answer = generateMockAnswer(query, routing.type, sources);
+            answer = generateMockAnswer(query, routing.type);
         }
 
-        // Ensure answer is defined
-        answer = answer || generateMockAnswer(query, routing.type, sources);
-
-        const response: QueryResponse = {
-            query,
-            answer,
-            query_type: routing.type,
-            confidence: routing.confidence,
-            sources,
-            code_examples: include_code_examples ? getCodeExamples(routing.type) : [],
-            matched_keywords: routing.keywords,
-            suggested_tags: routing.tags,
-            llm_info: {
-                provider: llmProvider,
-                model: llmModel,
-                is_nvidia: isNvidia,
-            },
-            nvidia_technologies: isNvidia ? ['nim', 'cuda'] : ['cuda'],
-        };
+        const response = buildQueryResponse(query, routing, answer, fromNim, include_code_examples);
 
-        // Add performance headers
-        const headers = new Headers();
         headers.set('X-Response-Time', `${Date.now() - startTime}ms`);
-        headers.set('X-Rate-Limit-Remaining', String(rateLimit.remaining));
 
         return NextResponse.json(response, { headers });
 
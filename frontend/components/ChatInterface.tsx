@@ -34,11 +34,46 @@ interface Message {
     content: string;
     data?: QueryResponse; // Store full API response for assistant messages
     error?: boolean;
+    streaming?: boolean; // Partial answer still being streamed in
 }
 
 // Request timeout configuration
 const REQUEST_TIMEOUT_MS = 35000; // 35 seconds (slightly more than API timeout)
 
+// Read the NDJSON answer stream from /api/query, reporting the partial answer as it grows
+async function readAnswerStream(
+    body: ReadableStream<Uint8Array>,
+    onPartial: (answer: string) => void
+): Promise<QueryResponse> {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    let answer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+
+        let newline = buffered.indexOf('\n');
+        while (newline >= 0) {
+            const line = buffered.slice(0, newline).trim();
+            buffered = buffered.slice(newline + 1);
+            newline = buffered.indexOf('\n');
+            if (!line) continue;
+
+            const event = JSON.parse(line);
+            if (event.done) {
+                return event.response as QueryResponse;
+            }
+            answer += event.delta;
+            onPartial(answer);
+        }
+    }
+
+    throw new Error('The answer stream ended unexpectedly. Please try again.');
+}
+
 export default function NvidiaDocNavigator() {
     const [messages, setMessages] = useState<Message[]>([]);
     const [input, setInput] = useState('');
@@ -144,7 +179,8 @@ export default function NvidiaDocNavigator() {
                 body: JSON.stringify({
                     query: text,
                     n_results: 5,
-                    include_code_examples: true
+                    include_code_examples: true,
+                    stream: true
                 }),
                 signal,
             });
@@ -163,14 +199,45 @@ export default function NvidiaDocNavigator() {
                 throw new Error(`API Error: ${response.statusText}`);
             }
 
-            const data: QueryResponse = await response.json();
+            let data: QueryResponse;
+            const contentType = response.headers.get('content-type') || '';
+
+            if (contentType.includes('application/x-ndjson') && response.body) {
+                // Render the answer as it streams in, at most once per animation frame
+                let frame = 0;
+                let latest = '';
+                const showPartial = () => {
+                    frame = 0;
+                    setMessages(prev => {
+                        const last = prev[prev.length - 1];
+                        if (last?.streaming) {
+                            return [...prev.slice(0, -1), { ...last, content: latest }];
+                        }
+                        return [...prev, { role: 'assistant', content: latest, streaming: true }];
+                    });
+                };
+
+                try {
+                    data = await readAnswerStream(response.body, (partial) => {
+                        latest = partial;
+                        if (!frame) {
+                            frame = requestAnimationFrame(showPartial);
+                        }
+                    });
+                } finally {
+                    cancelAnimationFrame(frame);
+                }
+            } else {
+                data = await response.json();
+            }
 
             const aiMessage: Message = {
                 role: 'assistant',
                 content: data.answer,
                 data: data
             };
-            setMessages(prev => [...prev, aiMessage]);
+            // The final message replaces the streamed placeholder, if one was shown
+            setMessages(prev => [...prev.filter(m => !m.streaming), aiMessage]);
 
             // Show CUDA popup for programming queries
             if (!shownTechs.has('cuda') && (data.query_type === 'cuda_general' || data.query_type === 'cuda_profiling')) {
@@ -205,8 +272,12 @@ export default function NvidiaDocNavigator() {
                     : "I'm sorry, I encountered an error while connecting to the NVIDIA documentation server. Please ensure the backend is running.",
                 error: true
             };
-            setMessages(prev => [...prev, errorMessage]);
+            setMessages(prev => [...prev.filter(m => !m.streaming), errorMessage]);
         } finally {
+            // Keep any partial answer from a cancelled stream, but mark it finished
+            setMessages(prev => prev.some(m => m.streaming)
+                ? prev.map(m => m.streaming ? { ...m, streaming: false } : m)
+                : prev);
             setIsTyping(false);
             abortControllerRef.current = null;
         }
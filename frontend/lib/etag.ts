@@ -0,0 +1,43 @@
+import { createHash } from 'crypto';
+import { NextRequest, NextResponse } from 'next/server';
+
+export interface PrecomputedJson {
+    body: string;
+    etag: string;
+}
+
+// Utility: Strong ETag for a serialized response body
+export function computeETag(body: string): string {
+    return `"${createHash('sha1').update(body).digest('base64url')}"`;
+}
+
+// Utility: Check whether the client already holds this representation
+export function isNotModified(request: NextRequest, etag: string): boolean {
+    const ifNoneMatch = request.headers.get('if-none-match');
+    if (!ifNoneMatch) {
+        return false;
+    }
+
+    return ifNoneMatch === '*' ||
+        ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag);
+}
+
+// Serialize and tag a payload once, for responses that are fixed for the life of the instance
+export function precomputeJson(payload: unknown): PrecomputedJson {
+    const body = JSON.stringify(payload);
+    return { body, etag: computeETag(body) };
+}
+
+// Send a pre-serialized body; polling clients that send If-None-Match get an empty 304
+export function respondWithETag(request: NextRequest, { body, etag }: PrecomputedJson): NextResponse {
+    if (isNotModified(request, etag)) {
+        return new NextResponse(null, { status: 304, headers: { ETag: etag } });
+    }
+
+    return new NextResponse(body, {
+        headers: {
+            'Content-Type': 'application/json',
+            ETag: etag,
+        },
+    });
+}
@@ -0,0 +1,82 @@
+// In-memory cache for LLM answers (per server instance; for production, use Redis)
+
+// Filler words that don't change what is being asked, so "What is CUDA?" and
+// "Explain CUDA" resolve to the same cache entry. "how" and the modals stay in the
+// key: "Can I run MIG on X?" and "How do I run MIG on X?" ask different things.
+const FILLER_WORDS = new Set([
+    'a', 'an', 'the', 'is', 'are', 'was', 'of', 'to', 'for', 'in', 'on', 'me',
+    'i', 'my', 'please', 'what', 'whats', 'explain', 'describe', 'tell', 'about', 'show',
+]);
+
+const APOSTROPHE_PATTERN = /['\u2019]/g;
+// Anything but letters and digits in any script, whitespace, and the symbols that
+// carry meaning in technical terms (c++, c#, fp16-int8, v1.2)
+const KEY_SEPARATOR_PATTERN = /[^\p{L}\p{N}\s.+#-]/gu;
+
+interface CacheEntry<T> {
+    value: T;
+    expiresAt: number;
+}
+
+// Utility: Reduce an already-lowercased query to a stable cache key
+// (punctuation and filler insensitive)
+export function normalizeQuery(lowerQuery: string): string {
+    return lowerQuery
+        .replace(APOSTROPHE_PATTERN, '') // Keep "what's" as one word
+        .replace(KEY_SEPARATOR_PATTERN, ' ')
+        .split(/\s+/)
+        .map(word => word.replace(/^[.-]+|[.-]+$/g, ''))
+        .filter(word => word && !FILLER_WORDS.has(word))
+        .join(' ');
+}
+
+// Map order doubles as LRU order: hits move to the tail, and once maxEntries is
+// reached the head (least recently used) is evicted. Every entry shares one TTL,
+// so expired entries mostly collect at the head and are swept without a full scan;
+// the few a hit moved further back are dropped on lookup or by the size bound.
+export class TTLCache<T> {
+    private entries = new Map<string, CacheEntry<T>>();
+
+    constructor(private readonly ttlMs: number, private readonly maxEntries: number) {}
+
+    get(key: string): T | undefined {
+        const entry = this.entries.get(key);
+        if (!entry) {
+            return undefined;
+        }
+
+        if (Date.now() > entry.expiresAt) {
+            this.entries.delete(key);
+            return undefined;
+        }
+
+        // Mark as most recently used
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    set(key: string, value: T): void {
+        this.evictExpired();
+        // Re-insert so a refreshed key moves to the tail
+        this.entries.delete(key);
+        this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+
+        if (this.entries.size > this.maxEntries) {
+            const oldest = this.entries.keys().next().value;
+            if (oldest !== undefined) {
+                this.entries.delete(oldest);
+            }
+        }
+    }
+
+    private evictExpired(): void {
+        const now = Date.now();
+        for (const [key, entry] of this.entries) {
+            if (entry.expiresAt >= now) {
+                break;
+            }
+            this.entries.delete(key);
+        }
+    }
+}
@@ -1,4 +1,7 @@
 /** @type {import('next').NextConfig} */
-const nextConfig = {};
+const nextConfig = {
+    // Emit the minimal standalone server the Dockerfile runs (node server.js)
+    output: 'standalone',
+};
 
 export default nextConfig;